@@ -0,0 +1,47 @@
+"""One-off rebuild of expense_tags from Expense.tags.
+
+The index_expense_tags trigger keeps expense_tags current for every expense
+written after it is installed. This rebuilds the rows for expenses written
+before that. Run it once after the first deploy that installs the trigger:
+
+    kubectl exec -n expense-tracker deploy/backend -- python -m app.backfill_tags
+
+Each batch runs in its own short transaction, so it can run alongside live
+traffic, and re-running it is harmless.
+"""
+import asyncio
+import os
+from sqlalchemy import select, delete, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from app.database import engine
+from app.models import Expense, ExpenseTag
+
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "1000"))
+
+INSERT_TAGS = text("""
+    INSERT INTO expense_tags (expense_id, tag, user_id, amount, expense_date)
+    SELECT DISTINCT e.id, btrim(t.tag), e.user_id, e.amount, e.expense_date
+    FROM expenses e, unnest(e.tags) AS t(tag)
+    WHERE e.id = ANY(:ids) AND btrim(t.tag) <> ''
+""").bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=True))))
+
+async def backfill_tags():
+    after = None
+    total = 0
+    while True:
+        async with engine.begin() as conn:
+            query = select(Expense.id).order_by(Expense.id).limit(BACKFILL_BATCH_SIZE)
+            if after is not None:
+                query = query.where(Expense.id > after)
+            ids = (await conn.execute(query)).scalars().all()
+            if not ids:
+                break
+            await conn.execute(delete(ExpenseTag).where(ExpenseTag.expense_id.in_(ids)))
+            await conn.execute(INSERT_TAGS, {"ids": ids})
+        after = ids[-1]
+        total += len(ids)
+        print(f"Indexed tags for {total} expenses")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_tags())
@@ -0,0 +1,323 @@
+"""Recurring-expense and anomaly detection.
+
+A user's expense history is handed to a process pool, which encodes it into
+columnar NumPy arrays and analyses it, so the event loop is never blocked
+by the per-row work.
+Results are cached per user until their expenses change.
+"""
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models import Expense
+from app.schemas import RecurringExpense, ExpenseAnomaly
+
+INSIGHTS_WORKERS = int(os.getenv("INSIGHTS_WORKERS", "2"))
+INSIGHTS_CACHE_SIZE = int(os.getenv("INSIGHTS_CACHE_SIZE", "1024"))
+
+# Billing periods as (name, days, tolerance in days)
+PERIODS = (
+    ("weekly", 7, 1),
+    ("biweekly", 14, 2),
+    ("monthly", 30, 3),
+    ("quarterly", 91, 6),
+    ("yearly", 365, 10),
+)
+RECURRING_MIN_OCCURRENCES = 3
+RECURRING_MAX_AMOUNT_CV = 0.2
+
+# Modified z-score cut-off (Iglewicz and Hoaglin)
+ANOMALY_THRESHOLD = 3.5
+ANOMALY_MIN_SAMPLES = 5
+
+_executor = None
+_cache = OrderedDict()
+# (user_id, fingerprint) -> Task for a computation already under way
+_pending = {}
+
+_NON_ALPHA = re.compile(r"[^a-z]+")
+
+
+def normalize_description(description: str) -> str:
+    # "Netflix #0423" and "NETFLIX 0524" should land in the same series
+    return _NON_ALPHA.sub(" ", description.lower()).strip()
+
+
+def find_recurring(days, amounts, categories, descriptions, today):
+    """Detect periodic charges.
+
+    Expenses are grouped by (category, normalized description); a group is
+    recurring when its intervals cluster around one of PERIODS and its
+    amounts are stable. Returns one dict per series, referencing the
+    original row index of its latest charge.
+    """
+    if days.size == 0:
+        return []
+
+    _, group = np.unique(
+        categories * (descriptions.max() + 1) + descriptions, return_inverse=True
+    )
+    n_groups = group.max() + 1
+
+    order = np.lexsort((days, group))
+    s_days = days[order]
+    s_group = group[order]
+    s_amounts = amounts[order]
+
+    counts = np.bincount(s_group, minlength=n_groups)
+    last = np.cumsum(counts) - 1
+
+    # Intervals between consecutive charges within the same group
+    same = s_group[1:] == s_group[:-1]
+    iv_group = s_group[1:][same]
+    intervals = np.diff(s_days)[same].astype(np.float64)
+    n_iv = np.bincount(iv_group, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        iv_mean = np.bincount(iv_group, weights=intervals, minlength=n_groups) / n_iv
+        iv_var = (
+            np.bincount(iv_group, weights=intervals ** 2, minlength=n_groups) / n_iv
+            - iv_mean ** 2
+        )
+        amt_mean = np.bincount(s_group, weights=s_amounts, minlength=n_groups) / counts
+        amt_var = (
+            np.bincount(s_group, weights=s_amounts ** 2, minlength=n_groups) / counts
+            - amt_mean ** 2
+        )
+    iv_std = np.sqrt(np.clip(iv_var, 0, None))
+    amt_cv = np.sqrt(np.clip(amt_var, 0, None)) / amt_mean
+
+    period_days = np.array([p[1] for p in PERIODS], dtype=np.float64)
+    period_tol = np.array([p[2] for p in PERIODS], dtype=np.float64)
+    fits = np.abs(iv_mean[:, None] - period_days[None, :]) <= period_tol[None, :]
+    period = fits.argmax(axis=1)
+
+    recurring = (
+        (counts >= RECURRING_MIN_OCCURRENCES)
+        & fits.any(axis=1)
+        & (iv_std <= period_tol[period])
+        & (amt_cv <= RECURRING_MAX_AMOUNT_CV)
+    )
+
+    results = []
+    for g in np.flatnonzero(recurring):
+        name, _, p_tol = PERIODS[period[g]]
+        last_day = int(s_days[last[g]])
+        next_day = last_day + int(round(iv_mean[g]))
+        results.append({
+            "index": int(order[last[g]]),
+            "frequency": name,
+            "interval_days": float(iv_mean[g]),
+            "average_amount": float(amt_mean[g]),
+            "occurrences": int(counts[g]),
+            "next_expected_day": next_day,
+            "active": today <= next_day + p_tol,
+        })
+    return results
+
+
+def _group_medians(values, counts):
+    # values must already be sorted by (group, value)
+    starts = np.cumsum(counts) - counts
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+    return (values[lo] + values[hi]) / 2
+
+
+def find_anomalies(amounts, categories):
+    """Flag unusually large expenses per category.
+
+    Uses the modified z-score 0.6745 * (x - median) / MAD, falling back to
+    the mean absolute deviation when more than half the amounts are equal.
+    Returns (index, median, score) dicts for the flagged rows.
+    """
+    if amounts.size == 0:
+        return []
+
+    n_cats = categories.max() + 1
+    counts = np.bincount(categories, minlength=n_cats)
+
+    order = np.lexsort((amounts, categories))
+    median = _group_medians(amounts[order], counts)
+
+    deviation = np.abs(amounts - median[categories])
+    order = np.lexsort((deviation, categories))
+    mad = _group_medians(deviation[order], counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_ad = np.bincount(categories, weights=deviation, minlength=n_cats) / counts
+    scale = np.where(mad > 0, mad / 0.6745, mean_ad * 1.2533)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(
+            scale[categories] > 0,
+            (amounts - median[categories]) / scale[categories],
+            0.0,
+        )
+
+    flagged = (counts[categories] >= ANOMALY_MIN_SAMPLES) & (score > ANOMALY_THRESHOLD)
+    return [
+        {
+            "index": int(i),
+            "median": float(median[categories[i]]),
+            "score": float(score[i]),
+        }
+        for i in np.flatnonzero(flagged)
+    ]
+
+
+def _encode(values, n):
+    # Dictionary-encode hashable values into dense integer codes
+    codes = {}
+    return np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int64, count=n)
+
+
+def analyse(dates, amounts, category_ids, descriptions, today):
+    """Process pool entry point.
+
+    Takes the raw expense columns as plain lists so that converting them to
+    arrays happens in the worker rather than on the event loop.
+    """
+    n = len(dates)
+    days = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=n)
+    amounts = np.fromiter((float(a) for a in amounts), dtype=np.float64, count=n)
+    categories = _encode(category_ids, n)
+    descriptions = _encode((normalize_description(d) for d in descriptions), n)
+    return (
+        find_recurring(days, amounts, categories, descriptions, today),
+        find_anomalies(amounts, categories),
+    )
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=INSIGHTS_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _fingerprint(db: AsyncSession, user_id):
+    # Changes whenever an expense is created, updated or deleted
+    result = await db.execute(
+        select(
+            func.count(Expense.id),
+            func.max(Expense.updated_at),
+            func.sum(Expense.amount),
+        ).where(Expense.user_id == user_id)
+    )
+    return tuple(result.first())
+
+
+async def get_user_insights(db: AsyncSession, user_id):
+    """Return (recurring, anomalies) for a user, computing them if stale."""
+    today = date.today()
+    key = (await _fingerprint(db, user_id), today)
+
+    cached = _cache.get(user_id)
+    if cached is not None and cached[0] == key:
+        _cache.move_to_end(user_id)
+        return cached[1]
+
+    # Concurrent requests for the same data share one computation. It runs in
+    # its own task with its own session, so it finishes even if the request
+    # that started it is cancelled; each caller awaits it through a shield.
+    task = _pending.get((user_id, key))
+    if task is None:
+        task = asyncio.ensure_future(_compute_insights(user_id, today))
+        _pending[(user_id, key)] = task
+        task.add_done_callback(lambda t: _finish_insights(user_id, key, t))
+    return await asyncio.shield(task)
+
+
+def _finish_insights(user_id, key, task):
+    del _pending[(user_id, key)]
+    if task.cancelled():
+        return
+    # Retrieving the exception stops asyncio warning when no caller is left
+    if task.exception() is not None:
+        return
+    _cache[user_id] = (key, task.result())
+    _cache.move_to_end(user_id)
+    while len(_cache) > INSIGHTS_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def _run_analysis(*args):
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        return await loop.run_in_executor(executor, analyse, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed) and the pool cannot recover; replace
+        # it, unless a concurrent caller already has, and retry once
+        if _executor is executor:
+            shutdown_executor()
+        return await loop.run_in_executor(_get_executor(), analyse, *args)
+
+
+async def _compute_insights(user_id, today):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                Expense.id,
+                Expense.expense_date,
+                Expense.amount,
+                Expense.category_id,
+                Expense.description,
+            ).where(Expense.user_id == user_id)
+        )
+        rows = result.all()
+    columns = [list(column) for column in zip(*rows)] if rows else [[]] * 5
+    _, dates, amounts, category_ids, descriptions = columns
+
+    found_recurring, found_anomalies = await _run_analysis(
+        dates,
+        amounts,
+        category_ids,
+        descriptions,
+        today.toordinal(),
+    )
+
+    recurring = [
+        RecurringExpense(
+            category_id=rows[item["index"]].category_id,
+            description=rows[item["index"]].description,
+            frequency=item["frequency"],
+            interval_days=round(item["interval_days"], 1),
+            average_amount=round(Decimal(item["average_amount"]), 2),
+            occurrences=item["occurrences"],
+            last_date=rows[item["index"]].expense_date,
+            next_expected_date=date.fromordinal(item["next_expected_day"]),
+            active=item["active"],
+        )
+        for item in found_recurring
+    ]
+    anomalies = [
+        ExpenseAnomaly(
+            expense_id=rows[item["index"]].id,
+            category_id=rows[item["index"]].category_id,
+            description=rows[item["index"]].description,
+            expense_date=rows[item["index"]].expense_date,
+            amount=rows[item["index"]].amount,
+            expected_amount=round(Decimal(item["median"]), 2),
+            score=round(item["score"], 2),
+        )
+        for item in found_anomalies
+    ]
+    anomalies.sort(key=lambda a: a.expense_date, reverse=True)
+    return recurring, anomalies
@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, users, categories, expenses, analytics
+from app.routers import auth, users, categories, expenses, analytics, admin, sync
+from sqlalchemy import text
 from app.database import engine
 from app.models import Base
+from app.insights import shutdown_executor
+from app.slow_queries import RequestScopeMiddleware
 import asyncio
 
 app = FastAPI(
@@ -20,12 +23,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tag database statements with the request they were issued for
+app.add_middleware(RequestScopeMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
 app.include_router(expenses.router, prefix="/api/v1/expenses", tags=["expenses"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(sync.router, prefix="/api/v1/sync", tags=["sync"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -35,8 +43,43 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# create_all only creates missing tables, so columns, indexes and triggers
+# added to existing tables are applied here. Keep these cheap: they run on
+# every start, so one-off data backfills belong in app/backfill_tags.py.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE categories ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()",
+    "CREATE INDEX IF NOT EXISTS idx_categories_user_updated ON categories(user_id, updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_user_updated ON expenses(user_id, updated_at)",
+    # Keep expense_tags in step with every expense write, whichever replica
+    # or client makes it
+    """
+    CREATE OR REPLACE FUNCTION index_expense_tags()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        DELETE FROM expense_tags WHERE expense_id = NEW.id;
+        INSERT INTO expense_tags (expense_id, tag, user_id, amount, expense_date)
+        SELECT DISTINCT NEW.id, btrim(t.tag), NEW.user_id, NEW.amount, NEW.expense_date
+        FROM unnest(NEW.tags) AS t(tag)
+        WHERE btrim(t.tag) <> '';
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER index_expense_tags
+        AFTER INSERT OR UPDATE OF tags, amount, expense_date, user_id ON expenses
+        FOR EACH ROW EXECUTE FUNCTION index_expense_tags()
+    """,
+]
+
 # Create tables on startup
 @app.on_event("startup")
 async def create_tables():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+
+@app.on_event("shutdown")
+async def stop_insights_workers():
+    shutdown_executor()
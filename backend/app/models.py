@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Date, ARRAY, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, DECIMAL, Date, ARRAY, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -28,9 +28,14 @@ class Category(Base):
     color = Column(String(7), default="#6B7280")
     icon = Column(String(50), default="receipt")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     user = relationship("User", back_populates="categories")
     expenses = relationship("Expense", back_populates="category")
+    
+    __table_args__ = (
+        Index("idx_categories_user_updated", "user_id", "updated_at"),
+    )
 
 class Expense(Base):
     __tablename__ = "expenses"
@@ -47,4 +52,37 @@ class Expense(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     user = relationship("User", back_populates="expenses")
-    category = relationship("Category", back_populates="expenses")
\ No newline at end of file
+    category = relationship("Category", back_populates="expenses")
+    
+    __table_args__ = (
+        Index("idx_expenses_user_updated", "user_id", "updated_at"),
+    )
+
+class ExpenseTag(Base):
+    """One row per (expense, tag), denormalized for tag analytics."""
+    __tablename__ = "expense_tags"
+    
+    expense_id = Column(UUID(as_uuid=True), ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(Text, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(DECIMAL(10, 2), nullable=False)
+    expense_date = Column(Date, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_expense_tags_user_tag_date", "user_id", "tag", "expense_date"),
+        Index("idx_expense_tags_user_date", "user_id", "expense_date"),
+    )
+
+class Tombstone(Base):
+    """Records a deleted expense or category so delta syncs can report it."""
+    __tablename__ = "tombstones"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.models import User
+from app.schemas import SlowQueryReport
+from app.dependencies import get_admin_user
+from app import slow_queries
+
+router = APIRouter()
+
+# Samples are held in memory by each replica, so these endpoints only see
+# the pod that served the request; the response names it in `host`.
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+async def get_slow_queries(
+    route: Optional[str] = Query(None),
+    min_duration_ms: float = Query(0, ge=0),
+    admin_user: User = Depends(get_admin_user)
+):
+    samples = [
+        sample for sample in reversed(slow_queries.samples)
+        if (route is None or sample["route"] == route)
+        and sample["duration_ms"] >= min_duration_ms
+    ]
+    return SlowQueryReport(host=slow_queries.HOSTNAME, samples=samples)
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(admin_user: User = Depends(get_admin_user)):
+    slow_queries.samples.clear()
+    return {
+        "message": "Slow query samples cleared",
+        "host": slow_queries.HOSTNAME
+    }
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, cast, literal_column, Date
 from sqlalchemy.orm import selectinload
-from typing import Optional
+from typing import List, Optional
 from datetime import date, timedelta
 from decimal import Decimal
 from app.database import get_db
-from app.models import User, Expense, Category
-from app.schemas import AnalyticsSummary, CategorySummary, DailySummary
+from app.models import User, Expense, Category, ExpenseTag
+from app.schemas import (
+    AnalyticsSummary, CategorySummary, DailySummary,
+    TagSummary, TagPeriodSummary, RecurringExpense, ExpenseAnomaly
+)
 from app.dependencies import get_current_user
+from app.insights import get_user_insights
 
 router = APIRouter()
 
@@ -99,4 +103,114 @@ async def get_analytics_summary(
         average_per_day=average_per_day,
         by_category=by_category,
         daily_totals=daily_totals
-    )
\ No newline at end of file
+    )
+
+def tag_conditions(user_id, start_date: Optional[date], end_date: Optional[date]):
+    # Default to last 30 days if no dates provided
+    if not end_date:
+        end_date = date.today()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+    return [
+        ExpenseTag.user_id == user_id,
+        ExpenseTag.expense_date >= start_date,
+        ExpenseTag.expense_date <= end_date
+    ]
+
+@router.get("/tags", response_model=List[TagSummary])
+async def get_tag_summary(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(
+            ExpenseTag.tag,
+            func.sum(ExpenseTag.amount).label('total_amount'),
+            func.count().label('expense_count')
+        )
+        .where(and_(*tag_conditions(current_user.id, start_date, end_date)))
+        .group_by(ExpenseTag.tag)
+        .order_by(func.sum(ExpenseTag.amount).desc())
+    )
+    
+    return [
+        TagSummary(
+            tag=row.tag,
+            total_amount=row.total_amount,
+            expense_count=row.expense_count
+        )
+        for row in result
+    ]
+
+@router.get("/tags/timeseries", response_model=List[TagPeriodSummary])
+async def get_tag_timeseries(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    interval: str = Query("day", pattern="^(day|week|month)$"),
+    tag: Optional[List[str]] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    conditions = tag_conditions(current_user.id, start_date, end_date)
+    if tag:
+        conditions.append(ExpenseTag.tag.in_(tag))
+    
+    if interval == "day":
+        period = ExpenseTag.expense_date
+    else:
+        # Inlined rather than bound so SELECT and GROUP BY match exactly;
+        # interval is restricted to known values by the query pattern
+        period = cast(
+            func.date_trunc(literal_column(f"'{interval}'"), ExpenseTag.expense_date),
+            Date
+        )
+    period = period.label('period')
+    
+    result = await db.execute(
+        select(
+            ExpenseTag.tag,
+            period,
+            func.sum(ExpenseTag.amount).label('total_amount'),
+            func.count().label('expense_count')
+        )
+        .where(and_(*conditions))
+        .group_by(ExpenseTag.tag, period)
+        .order_by(ExpenseTag.tag, period)
+    )
+    
+    return [
+        TagPeriodSummary(
+            tag=row.tag,
+            period=row.period,
+            total_amount=row.total_amount,
+            expense_count=row.expense_count
+        )
+        for row in result
+    ]
+
+@router.get("/recurring", response_model=List[RecurringExpense])
+async def get_recurring_expenses(
+    active_only: bool = Query(True),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    recurring, _ = await get_user_insights(db, current_user.id)
+    if active_only:
+        recurring = [r for r in recurring if r.active]
+    return sorted(recurring, key=lambda r: r.next_expected_date)
+
+@router.get("/anomalies", response_model=List[ExpenseAnomaly])
+async def get_expense_anomalies(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    _, anomalies = await get_user_insights(db, current_user.id)
+    if start_date:
+        anomalies = [a for a in anomalies if a.expense_date >= start_date]
+    if end_date:
+        anomalies = [a for a in anomalies if a.expense_date <= end_date]
+    return anomalies
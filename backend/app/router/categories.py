@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models import User, Category
 from app.schemas import CategoryCreate, CategoryUpdate, Category as CategorySchema
 from app.dependencies import get_current_user
+from app.tombstones import record_tombstone
 
 router = APIRouter()
 
@@ -97,5 +98,6 @@ async def delete_category(
         )
     
     await db.delete(db_category)
+    await record_tombstone(db, current_user.id, "category", db_category.id)
     await db.commit()
     return {"message": "Category deleted"}
\ No newline at end of file
@@ -2,28 +2,59 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import date
 from app.database import get_db
 from app.models import User, Expense, Category
 from app.schemas import (
     ExpenseCreate, ExpenseUpdate, Expense as ExpenseSchema,
-    ExpenseListResponse, PaginatedResponse
+    ExpenseListResponse, NormalizedExpenseListResponse, PaginatedResponse
 )
 from app.dependencies import get_current_user
+from app.tombstones import record_tombstone
 
 router = APIRouter()
 
-@router.get("/", response_model=ExpenseListResponse)
+# Columns selectable through the `fields` projection
+EXPENSE_FIELDS = {
+    "id": Expense.id,
+    "user_id": Expense.user_id,
+    "category_id": Expense.category_id,
+    "amount": Expense.amount,
+    "description": Expense.description,
+    "expense_date": Expense.expense_date,
+    "receipt_url": Expense.receipt_url,
+    "tags": Expense.tags,
+    "created_at": Expense.created_at,
+    "updated_at": Expense.updated_at,
+}
+
+@router.get("/", response_model=Union[ExpenseListResponse, NormalizedExpenseListResponse])
 async def get_expenses(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     category_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    normalized: bool = Query(False),
+    fields: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in EXPENSE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {unknown[0]}"
+            )
+        selected = list(dict.fromkeys(["id"] + requested))
+    else:
+        selected = list(EXPENSE_FIELDS)
+    if normalized and "category_id" not in selected:
+        selected.append("category_id")
+    
     # Build query conditions
     conditions = [Expense.user_id == current_user.id]
     
@@ -40,8 +71,43 @@ async def get_expenses(
     )
     total = count_result.scalar()
     
-    # Get expenses with pagination
     offset = (page - 1) * limit
+    pages = (total + limit - 1) // limit
+    pagination = PaginatedResponse(
+        page=page,
+        limit=limit,
+        total=total,
+        pages=pages
+    )
+    
+    if normalized or fields:
+        # Fetch only the projected columns, without loading categories
+        result = await db.execute(
+            select(*[EXPENSE_FIELDS[f] for f in selected])
+            .where(and_(*conditions))
+            .order_by(Expense.expense_date.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = [dict(row._mapping) for row in result]
+        
+        categories = None
+        if normalized:
+            category_ids = {row["category_id"] for row in rows}
+            categories = []
+            if category_ids:
+                cat_result = await db.execute(
+                    select(Category).where(Category.id.in_(category_ids))
+                )
+                categories = cat_result.scalars().all()
+        
+        return NormalizedExpenseListResponse(
+            expenses=rows,
+            categories=categories,
+            pagination=pagination
+        )
+    
+    # Get expenses with pagination
     result = await db.execute(
         select(Expense)
         .options(selectinload(Expense.category))
@@ -52,16 +118,9 @@ async def get_expenses(
     )
     expenses = result.scalars().all()
     
-    pages = (total + limit - 1) // limit
-    
     return ExpenseListResponse(
         expenses=expenses,
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-            pages=pages
-        )
+        pagination=pagination
     )
 
 @router.post("/", response_model=ExpenseSchema)
@@ -179,5 +238,6 @@ async def delete_expense(
         )
     
     await db.delete(db_expense)
+    await record_tombstone(db, current_user.id, "expense", db_expense.id)
     await db.commit()
     return {"message": "Expense deleted"}
\ No newline at end of file
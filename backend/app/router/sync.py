@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func, tuple_
+from typing import Optional
+from datetime import datetime, timedelta
+import base64
+import binascii
+import json
+import os
+import uuid
+from app.database import get_db
+from app.models import User, Expense, Category, Tombstone
+from app.schemas import SyncResponse
+from app.dependencies import get_current_user
+from app.tombstones import TOMBSTONE_RETENTION
+
+router = APIRouter()
+
+# Rows written by transactions still in flight when a token was issued carry
+# an updated_at slightly before it; re-sending that window keeps them from
+# being missed. Clients apply changes by id, so repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=int(os.getenv("SYNC_OVERLAP_SECONDS", "5")))
+
+# A sync token carries `since` for a delta sync, or only `snapshot` for a
+# paged full sync started at that time. Continuation tokens add a cursor:
+# `after` (expense id) for full syncs, plus `after_updated_at` and the
+# `snapshot` upper bound for deltas.
+TOKEN_TIMESTAMPS = ("since", "snapshot", "after_updated_at")
+TOKEN_IDS = ("after",)
+
+def encode_sync_token(**fields) -> str:
+    payload = {
+        name: str(value) if name in TOKEN_IDS else value.isoformat()
+        for name, value in fields.items()
+        if value is not None
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_sync_token(token: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        decoded = {name: None for name in TOKEN_TIMESTAMPS + TOKEN_IDS}
+        for name in TOKEN_TIMESTAMPS:
+            if payload.get(name):
+                decoded[name] = datetime.fromisoformat(payload[name])
+        for name in TOKEN_IDS:
+            if payload.get(name):
+                decoded[name] = uuid.UUID(payload[name])
+    except (ValueError, TypeError, AttributeError, binascii.Error, UnicodeDecodeError):
+        decoded = None
+    if decoded is None or not (decoded["since"] or decoded["snapshot"]) or (
+        decoded["since"] and decoded["after"] and not decoded["after_updated_at"]
+    ) or any(
+        decoded[name] is not None and decoded[name].tzinfo is None for name in TOKEN_TIMESTAMPS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    return decoded
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Tokens are issued from the database clock, not the app server's
+    now_result = await db.execute(select(func.now()))
+    now = now_result.scalar()
+
+    token = decode_sync_token(since) if since else None
+    if token and token["since"] and token["since"] < now - TOMBSTONE_RETENTION:
+        # Tombstones this old may have been pruned; a delta could miss deletes
+        token = None
+
+    if token and token["since"]:
+        delta = await _delta_sync(db, current_user.id, token, now, limit)
+        if delta is not None:
+            return delta
+        # Too many deletions to page; the client rebuilds from a full sync
+        token = None
+
+    # Full sync, paged by expense id. Categories are sent with the first page.
+    # Changes made after the snapshot are picked up by the delta sync that
+    # follows the last page.
+    snapshot = token["snapshot"] if token else now
+    after = token["after"] if token else None
+
+    expense_conditions = [Expense.user_id == current_user.id]
+    if after:
+        expense_conditions.append(Expense.id > after)
+    expense_result = await db.execute(
+        select(Expense)
+        .where(and_(*expense_conditions))
+        .order_by(Expense.id)
+        .limit(limit + 1)
+    )
+    expenses = expense_result.scalars().all()
+    has_more = len(expenses) > limit
+    expenses = expenses[:limit]
+
+    categories = []
+    if not token:
+        category_result = await db.execute(
+            select(Category).where(Category.user_id == current_user.id)
+        )
+        categories = category_result.scalars().all()
+
+    if has_more:
+        sync_token = encode_sync_token(snapshot=snapshot, after=expenses[-1].id)
+    else:
+        sync_token = encode_sync_token(since=snapshot)
+
+    return SyncResponse(
+        expenses=expenses,
+        categories=categories,
+        deleted_expense_ids=[],
+        deleted_category_ids=[],
+        sync_token=sync_token,
+        full=True,
+        has_more=has_more
+    )
+
+async def _delta_sync(db: AsyncSession, user_id, token: dict, now: datetime,
+                      limit: int) -> Optional[SyncResponse]:
+    """Serve one page of a delta sync, or None to fall back to a full sync.
+
+    Expenses are paged by (updated_at, id) up to the `snapshot` fixed on the
+    first page; anything changed later is left for the next delta. Categories
+    and tombstones go out with the first page. Categories are few per user;
+    when tombstones exceed `limit`, the client is sent a full sync instead.
+    """
+    cutoff = token["since"] - SYNC_OVERLAP
+    first_page = token["after"] is None
+    snapshot = token["snapshot"] or now
+
+    categories = []
+    deleted_expense_ids = []
+    deleted_category_ids = []
+    if first_page:
+        tombstone_result = await db.execute(
+            select(Tombstone.entity_type, Tombstone.entity_id)
+            .where(
+                Tombstone.user_id == user_id,
+                Tombstone.deleted_at > cutoff,
+                Tombstone.deleted_at <= snapshot
+            )
+            .limit(limit + 1)
+        )
+        tombstones = tombstone_result.all()
+        if len(tombstones) > limit:
+            return None
+        for entity_type, entity_id in tombstones:
+            if entity_type == "expense":
+                deleted_expense_ids.append(entity_id)
+            elif entity_type == "category":
+                deleted_category_ids.append(entity_id)
+
+        category_result = await db.execute(
+            select(Category).where(
+                Category.user_id == user_id,
+                Category.updated_at > cutoff,
+                Category.updated_at <= snapshot
+            )
+        )
+        categories = category_result.scalars().all()
+
+    expense_conditions = [
+        Expense.user_id == user_id,
+        Expense.updated_at > cutoff,
+        Expense.updated_at <= snapshot
+    ]
+    if not first_page:
+        expense_conditions.append(
+            tuple_(Expense.updated_at, Expense.id) > tuple_(token["after_updated_at"], token["after"])
+        )
+    expense_result = await db.execute(
+        select(Expense)
+        .where(and_(*expense_conditions))
+        .order_by(Expense.updated_at, Expense.id)
+        .limit(limit + 1)
+    )
+    expenses = expense_result.scalars().all()
+    has_more = len(expenses) > limit
+    expenses = expenses[:limit]
+
+    if has_more:
+        sync_token = encode_sync_token(
+            since=token["since"],
+            snapshot=snapshot,
+            after_updated_at=expenses[-1].updated_at,
+            after=expenses[-1].id
+        )
+    else:
+        sync_token = encode_sync_token(since=snapshot)
+
+    return SyncResponse(
+        expenses=expenses,
+        categories=categories,
+        deleted_expense_ids=deleted_expense_ids,
+        deleted_category_ids=deleted_category_ids,
+        sync_token=sync_token,
+        full=False,
+        has_more=has_more
+    )
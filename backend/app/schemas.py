@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
 import uuid
@@ -46,6 +46,7 @@ class Category(CategoryBase):
     id: uuid.UUID
     user_id: uuid.UUID
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -81,6 +82,24 @@ class Expense(ExpenseBase):
     class Config:
         from_attributes = True
 
+class SyncExpense(ExpenseBase):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class SyncResponse(BaseModel):
+    expenses: List[SyncExpense]
+    categories: List[Category]
+    deleted_expense_ids: List[uuid.UUID]
+    deleted_category_ids: List[uuid.UUID]
+    sync_token: str
+    full: bool
+    has_more: bool
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
@@ -109,6 +128,13 @@ class ExpenseListResponse(BaseModel):
     expenses: List[Expense]
     pagination: PaginatedResponse
 
+class NormalizedExpenseListResponse(BaseModel):
+    # Expenses carry only the projected columns; each referenced category
+    # is sent once in `categories` when normalized
+    expenses: List[Dict[str, Any]]
+    categories: Optional[List[Category]] = None
+    pagination: PaginatedResponse
+
 # Analytics schemas
 class CategorySummary(BaseModel):
     category: Category
@@ -126,4 +152,49 @@ class AnalyticsSummary(BaseModel):
     expense_count: int
     average_per_day: Decimal
     by_category: List[CategorySummary]
-    daily_totals: List[DailySummary]
\ No newline at end of file
+    daily_totals: List[DailySummary]
+
+class TagSummary(BaseModel):
+    tag: str
+    total_amount: Decimal
+    expense_count: int
+
+class TagPeriodSummary(BaseModel):
+    tag: str
+    period: date
+    total_amount: Decimal
+    expense_count: int
+
+class RecurringExpense(BaseModel):
+    category_id: uuid.UUID
+    description: str
+    frequency: str
+    interval_days: float
+    average_amount: Decimal
+    occurrences: int
+    last_date: date
+    next_expected_date: date
+    active: bool
+
+class ExpenseAnomaly(BaseModel):
+    expense_id: uuid.UUID
+    category_id: uuid.UUID
+    description: str
+    expense_date: date
+    amount: Decimal
+    expected_amount: Decimal
+    score: float
+
+# Admin schemas
+class SlowQuerySample(BaseModel):
+    statement: str
+    duration_ms: float
+    route: Optional[str] = None
+    host: str
+    recorded_at: datetime
+    plan: Optional[Any] = None
+
+class SlowQueryReport(BaseModel):
+    # Samples are kept per process; host identifies the pod that answered
+    host: str
+    samples: List[SlowQuerySample]
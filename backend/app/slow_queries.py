@@ -0,0 +1,124 @@
+"""Slow-query sampling.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are recorded in a bounded
+ring buffer, tagged with the route that issued them. A fraction of slow
+SELECTs is re-run under EXPLAIN (ANALYZE, BUFFERS) in a background task
+and the plan is attached to the sample.
+
+The buffer lives in each worker process, so with several replicas every
+pod keeps its own samples; each one is tagged with the pod's hostname.
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "200"))
+SLOW_QUERY_MAX_PENDING_EXPLAINS = 2
+
+SKIP_OPTION = "skip_slow_query_sampling"
+
+HOSTNAME = socket.gethostname()
+
+# ASGI scope of the request being served; the route is read from it lazily
+# because routing has not happened yet when the middleware sets it
+current_scope = ContextVar("current_scope", default=None)
+
+samples = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+_pending_explains = set()
+_engine = None
+
+
+class RequestScopeMiddleware:
+    """Expose the ASGI scope of the current request to the cursor hooks."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+def _current_route():
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._query_start_time) * 1000
+    if elapsed_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    if conn.get_execution_options().get(SKIP_OPTION):
+        return
+
+    sample = {
+        "statement": statement,
+        "duration_ms": round(elapsed_ms, 2),
+        "route": _current_route(),
+        "host": HOSTNAME,
+        "recorded_at": datetime.now(timezone.utc),
+        "plan": None,
+    }
+    samples.append(sample)
+
+    if (
+        statement.lstrip()[:6].upper() == "SELECT"
+        and not executemany
+        and len(_pending_explains) < SLOW_QUERY_MAX_PENDING_EXPLAINS
+        and random.random() < SLOW_QUERY_EXPLAIN_RATE
+    ):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(_capture_explain(sample, statement, parameters))
+        _pending_explains.add(task)
+        task.add_done_callback(_pending_explains.discard)
+
+
+async def _capture_explain(sample, statement, parameters):
+    try:
+        async with _engine.connect() as conn:
+            conn = await conn.execution_options(**{SKIP_OPTION: True})
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            )
+            plan = result.scalar()
+            # Never commit: the connection is rolled back on close
+        sample["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as exc:
+        sample["plan"] = {"error": str(exc)}
+
+
+def install(engine):
+    """Attach the sampling hooks to an AsyncEngine."""
+    global _engine
+    if SLOW_QUERY_THRESHOLD_MS <= 0:
+        return
+    _engine = engine
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
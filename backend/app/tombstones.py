@@ -0,0 +1,23 @@
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+import os
+from app.models import Tombstone
+
+# Tombstones older than this are pruned; sync tokens older than this can no
+# longer be served as a delta and fall back to a full sync
+TOMBSTONE_RETENTION = timedelta(days=int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30")))
+
+async def record_tombstone(db: AsyncSession, user_id, entity_type: str, entity_id):
+    """Record a deletion for delta sync and prune the user's expired tombstones."""
+    await db.execute(
+        delete(Tombstone).where(
+            Tombstone.user_id == user_id,
+            Tombstone.deleted_at < func.now() - TOMBSTONE_RETENTION
+        )
+    )
+    db.add(Tombstone(
+        user_id=user_id,
+        entity_type=entity_type,
+        entity_id=entity_id
+    ))
@@ -20,4 +20,6 @@ kubectl wait --for=condition=ready pod -l app=backend -n expense-tracker --timeo
 echo "Backend deployment complete!"
 echo "To test the API:"
 echo "kubectl port-forward -n expense-tracker svc/backend-service 8000:8000"
-echo "Then visit: http://localhost:8000/docs"
\ No newline at end of file
+echo "Then visit: http://localhost:8000/docs"
+echo "After the first deploy with tag analytics, index existing expense tags once:"
+echo "kubectl exec -n expense-tracker deploy/backend -- python -m app.backfill_tags"
\ No newline at end of file
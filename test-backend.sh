@@ -25,6 +25,7 @@ class ExpenseTrackerTester:
         }
         self.test_category_id = None
         self.test_expense_id = None
+        self.insights_data = []
         
     def log(self, message, status="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -55,6 +56,30 @@ class ExpenseTrackerTester:
             self.log(f"Request failed: {e}", "ERROR")
             return None
     
+    def create_category_with_expenses(self, name, expenses):
+        """Create a uniquely named category holding the given expenses"""
+        category_data = {"name": f"{name} {int(time.time() * 1000)}"}
+        response = self.make_request("POST", "/categories", category_data)
+        if not response or response.status_code != 200:
+            return None, []
+        
+        category_id = response.json().get("id")
+        expense_ids = []
+        for expense in expenses:
+            expense_data = {"category_id": category_id, "tags": [], **expense}
+            response = self.make_request("POST", "/expenses", expense_data)
+            if not response or response.status_code != 200:
+                break
+            expense_ids.append(response.json().get("id"))
+        return category_id, expense_ids
+    
+    def delete_category_with_expenses(self, category_id, expense_ids):
+        """Remove data created by create_category_with_expenses"""
+        for expense_id in expense_ids:
+            self.make_request("DELETE", f"/expenses/{expense_id}")
+        if category_id:
+            self.make_request("DELETE", f"/categories/{category_id}")
+    
     def test_health_check(self):
         """Test the health check endpoint"""
         self.log("Testing health check endpoint...")
@@ -233,12 +258,46 @@ class ExpenseTrackerTester:
             
             for expense in expenses[:3]:  # Show first 3
                 self.log(f"   - ${expense.get('amount')} - {expense.get('description')}", "INFO")
-            
-            return True
         else:
             error_msg = response.json().get("detail", "Unknown error") if response else "No response"
             self.log(f"❌ Get expenses failed: {error_msg}", "ERROR")
             return False
+        
+        # Test normalized payload: categories sent once, expenses carry only category_id
+        response = self.make_request("GET", "/expenses", {"normalized": "true"})
+        if not response or response.status_code != 200:
+            self.log("❌ Normalized get expenses failed", "ERROR")
+            return False
+        data = response.json()
+        category_ids = [c.get("id") for c in data.get("categories", [])]
+        referenced = {e.get("category_id") for e in data.get("expenses", [])}
+        if any("category" in e for e in data.get("expenses", [])):
+            self.log("❌ Normalized expenses still embed category", "ERROR")
+            return False
+        if len(category_ids) != len(set(category_ids)) or set(category_ids) != referenced:
+            self.log(f"❌ Normalized categories do not match referenced ids: {category_ids}", "ERROR")
+            return False
+        self.log(f"✅ Normalized: {len(data.get('expenses', []))} expenses, {len(category_ids)} categories", "SUCCESS")
+        
+        # Test column projection
+        response = self.make_request("GET", "/expenses", {"fields": "amount,description"})
+        if not response or response.status_code != 200:
+            self.log("❌ Projected get expenses failed", "ERROR")
+            return False
+        expenses = response.json().get("expenses", [])
+        if any(set(e) != {"id", "amount", "description"} for e in expenses):
+            self.log(f"❌ Projection returned unexpected fields: {expenses[:1]}", "ERROR")
+            return False
+        self.log("✅ Projection returned only id, amount and description", "SUCCESS")
+        
+        # Test unknown projected field
+        response = self.make_request("GET", "/expenses", {"fields": "amount,password_hash"})
+        if not response or response.status_code != 400:
+            self.log("❌ Unknown field was not rejected with 400", "ERROR")
+            return False
+        self.log("✅ Unknown field rejected", "SUCCESS")
+        
+        return True
     
     def test_get_expense_by_id(self):
         """Test getting a specific expense"""
@@ -315,6 +374,219 @@ class ExpenseTrackerTester:
             self.log(f"❌ Analytics summary failed: {error_msg}", "ERROR")
             return False
     
+    def test_recurring_expenses(self):
+        """Test recurring expense detection"""
+        self.log("Testing recurring expenses...")
+        
+        today = date.today()
+        subscriptions = [
+            {
+                "amount": "12.99",
+                "description": f"Streaming service #{i}",
+                "expense_date": (today - timedelta(days=30 * i)).isoformat()
+            }
+            for i in range(4)
+        ]
+        groceries = [
+            {"amount": amount, "description": "Weekly groceries", "expense_date": (today - timedelta(days=i * 3 + 1)).isoformat()}
+            for i, amount in enumerate(["40.00", "42.50", "45.00", "38.00", "41.00", "43.50"])
+        ]
+        groceries.append({"amount": "900.00", "description": "Flat screen TV", "expense_date": today.isoformat()})
+        
+        self.insights_data = [
+            self.create_category_with_expenses("Test Subscriptions", subscriptions),
+            self.create_category_with_expenses("Test Groceries", groceries),
+        ]
+        
+        response = self.make_request("GET", "/analytics/recurring")
+        
+        if response and response.status_code == 200:
+            recurring = response.json()
+            subscription_category_id = self.insights_data[0][0]
+            found = [
+                r for r in recurring
+                if r.get("category_id") == subscription_category_id
+                and r.get("frequency") == "monthly"
+                and r.get("occurrences") == 4
+            ]
+            if not found:
+                self.log(f"❌ Monthly subscription not detected: {recurring}", "ERROR")
+                return False
+            self.log(f"✅ Recurring expenses: {len(recurring)} series", "SUCCESS")
+            self.log(f"   - {found[0].get('description')} next due {found[0].get('next_expected_date')}", "INFO")
+            return True
+        else:
+            error_msg = response.json().get("detail", "Unknown error") if response else "No response"
+            self.log(f"❌ Recurring expenses failed: {error_msg}", "ERROR")
+            return False
+    
+    def test_expense_anomalies(self):
+        """Test expense anomaly detection"""
+        self.log("Testing expense anomalies...")
+        
+        try:
+            response = self.make_request("GET", "/analytics/anomalies")
+            
+            if response and response.status_code == 200:
+                anomalies = response.json()
+                outlier_id = self.insights_data[1][1][-1] if self.insights_data else None
+                flagged = [a.get("expense_id") for a in anomalies]
+                if outlier_id not in flagged:
+                    self.log(f"❌ Outlier {outlier_id} not flagged: {anomalies}", "ERROR")
+                    return False
+                if set(flagged) & set(self.insights_data[1][1][:-1]):
+                    self.log("❌ Regular grocery expenses flagged as anomalies", "ERROR")
+                    return False
+                self.log(f"✅ Expense anomalies: {len(anomalies)} flagged", "SUCCESS")
+                return True
+            else:
+                error_msg = response.json().get("detail", "Unknown error") if response else "No response"
+                self.log(f"❌ Expense anomalies failed: {error_msg}", "ERROR")
+                return False
+        finally:
+            for category_id, expense_ids in self.insights_data:
+                self.delete_category_with_expenses(category_id, expense_ids)
+            self.insights_data = []
+    
+    def full_sync(self):
+        """Page through a full sync; returns (expenses, categories, token)"""
+        expenses, categories = [], []
+        params = {"limit": 100}
+        while True:
+            response = self.make_request("GET", "/sync", params)
+            if not response or response.status_code != 200:
+                return None, None, None
+            data = response.json()
+            expenses.extend(data.get("expenses", []))
+            categories.extend(data.get("categories", []))
+            if not data.get("has_more"):
+                return expenses, categories, data.get("sync_token")
+            params = {"limit": 100, "since": data.get("sync_token")}
+    
+    def test_sync_round_trip(self):
+        """Test full sync followed by a delta sync"""
+        self.log("Testing sync round trip...")
+        
+        today = date.today().isoformat()
+        category_id, expense_ids = self.create_category_with_expenses("Test Sync", [
+            {"amount": "10.00", "description": "Sync expense one", "expense_date": today},
+            {"amount": "20.00", "description": "Sync expense two", "expense_date": today},
+        ])
+        empty_category_id, _ = self.create_category_with_expenses("Test Sync Empty", [])
+        
+        try:
+            # Deltas re-send a short overlap window (SYNC_OVERLAP_SECONDS),
+            # so keep the seeding, token and changes apart
+            time.sleep(6)
+            expenses, categories, token = self.full_sync()
+            if token is None:
+                self.log("❌ Full sync failed", "ERROR")
+                return False
+            if not set(expense_ids) <= {e.get("id") for e in expenses} or \
+                    not {category_id, empty_category_id} <= {c.get("id") for c in categories}:
+                self.log("❌ Full sync is missing seeded data", "ERROR")
+                return False
+            self.log(f"✅ Full sync: {len(expenses)} expenses, {len(categories)} categories", "SUCCESS")
+            
+            time.sleep(6)
+            update_data = {
+                "category_id": category_id,
+                "amount": "11.00",
+                "description": "Sync expense one",
+                "expense_date": today,
+                "tags": []
+            }
+            self.make_request("PUT", f"/expenses/{expense_ids[0]}", update_data)
+            self.make_request("DELETE", f"/categories/{empty_category_id}")
+            
+            response = self.make_request("GET", "/sync", {"since": token})
+            if not response or response.status_code != 200:
+                error_msg = response.json().get("detail", "Unknown error") if response else "No response"
+                self.log(f"❌ Delta sync failed: {error_msg}", "ERROR")
+                return False
+            data = response.json()
+            if data.get("full") or \
+                    [e.get("id") for e in data.get("expenses", [])] != [expense_ids[0]] or \
+                    data.get("categories") or \
+                    data.get("deleted_expense_ids") or \
+                    data.get("deleted_category_ids") != [empty_category_id]:
+                self.log(f"❌ Delta sync returned unexpected changes: {data}", "ERROR")
+                return False
+            self.log("✅ Delta sync returned one update and one tombstone", "SUCCESS")
+            return True
+        finally:
+            self.delete_category_with_expenses(category_id, expense_ids)
+    
+    def get_tag_totals(self, tags):
+        """Fetch /analytics/tags as {tag: (total_amount, expense_count)} for the given tags"""
+        response = self.make_request("GET", "/analytics/tags")
+        if not response or response.status_code != 200:
+            return None
+        return {
+            t.get("tag"): (Decimal(str(t.get("total_amount"))), t.get("expense_count"))
+            for t in response.json() if t.get("tag") in tags
+        }
+    
+    def test_tag_analytics(self):
+        """Test tag totals, weekly tag time series and tag rewrites on update"""
+        self.log("Testing tag analytics...")
+        
+        suffix = int(time.time())
+        tag_a, tag_b, tag_c = f"food-{suffix}", f"work-{suffix}", f"travel-{suffix}"
+        today = date.today()
+        category_id, expense_ids = self.create_category_with_expenses("Test Tags", [
+            {"amount": "10.00", "description": "Team lunch", "expense_date": today.isoformat(), "tags": [tag_a, tag_b]},
+            {"amount": "5.00", "description": "Snack", "expense_date": (today - timedelta(days=1)).isoformat(), "tags": [tag_a]},
+        ])
+        
+        try:
+            totals = self.get_tag_totals({tag_a, tag_b})
+            expected = {tag_a: (Decimal("15.00"), 2), tag_b: (Decimal("10.00"), 1)}
+            if totals != expected:
+                self.log(f"❌ Tag totals {totals} != {expected}", "ERROR")
+                return False
+            self.log("✅ Tag totals match seeded expenses", "SUCCESS")
+            
+            response = self.make_request("GET", "/analytics/tags/timeseries", {"interval": "week", "tag": [tag_a, tag_b]})
+            if not response or response.status_code != 200:
+                error_msg = response.json().get("detail", "Unknown error") if response else "No response"
+                self.log(f"❌ Tag time series failed: {error_msg}", "ERROR")
+                return False
+            series = response.json()
+            weekly = {}
+            for point in series:
+                if date.fromisoformat(point.get("period")).weekday() != 0:
+                    self.log(f"❌ Weekly period does not start on a Monday: {point}", "ERROR")
+                    return False
+                weekly[point.get("tag")] = weekly.get(point.get("tag"), Decimal("0")) + Decimal(str(point.get("total_amount")))
+            if weekly != {tag_a: Decimal("15.00"), tag_b: Decimal("10.00")}:
+                self.log(f"❌ Weekly tag series does not add up: {series}", "ERROR")
+                return False
+            self.log(f"✅ Weekly tag series: {len(series)} points", "SUCCESS")
+            
+            # Changing tags and amount must rewrite the indexed tag rows
+            update_data = {
+                "category_id": category_id,
+                "amount": "30.00",
+                "description": "Team lunch",
+                "expense_date": today.isoformat(),
+                "tags": [tag_b, tag_c]
+            }
+            self.make_request("PUT", f"/expenses/{expense_ids[0]}", update_data)
+            totals = self.get_tag_totals({tag_a, tag_b, tag_c})
+            expected = {
+                tag_a: (Decimal("5.00"), 1),
+                tag_b: (Decimal("30.00"), 1),
+                tag_c: (Decimal("30.00"), 1),
+            }
+            if totals != expected:
+                self.log(f"❌ Tag totals after update {totals} != {expected}", "ERROR")
+                return False
+            self.log("✅ Tag rows rewritten on update", "SUCCESS")
+            return True
+        finally:
+            self.delete_category_with_expenses(category_id, expense_ids)
+    
     def test_delete_expense(self):
         """Test deleting an expense"""
         self.log("Testing expense deletion...")
@@ -371,6 +643,10 @@ class ExpenseTrackerTester:
             ("Get Expense by ID", self.test_get_expense_by_id),
             ("Update Expense", self.test_update_expense),
             ("Analytics Summary", self.test_analytics_summary),
+            ("Recurring Expenses", self.test_recurring_expenses),
+            ("Expense Anomalies", self.test_expense_anomalies),
+            ("Sync Round Trip", self.test_sync_round_trip),
+            ("Tag Analytics", self.test_tag_analytics),
             ("Delete Expense", self.test_delete_expense),
             ("Delete Category", self.test_delete_category),
         ]